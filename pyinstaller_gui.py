@@ -12,6 +12,260 @@ import os
 import sys
 import threading
 import importlib.util
+import importlib.machinery
+import hashlib
+import json
+import sysconfig
+import tempfile
+import time
+import signal
+import statistics
+import shutil
+
+
+def get_cache_dir():
+    """获取本机共享缓存目录（所有项目、所有打包共用）"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "PythonCompiler")
+
+
+# 追踪运行时注入的 sitecustomize.py：记录进程实际加载的模块和读取的文件
+TRACE_SITECUSTOMIZE = r'''
+import sys
+
+# 追踪钩子自身（以及被遮蔽的原 sitecustomize）导入的模块不计入结果
+_preloaded = set(sys.modules)
+
+import atexit
+import builtins
+import importlib
+import importlib.machinery
+import importlib.util
+import json
+import os
+import threading
+
+
+def _chain_sitecustomize():
+    # 本文件通过 PYTHONPATH 遮蔽了环境中原有的 sitecustomize（发行版、conda、coverage 等），
+    # 这里找到并执行原来的那个
+    here = os.path.dirname(os.path.abspath(__file__))
+    path = [p for p in sys.path if os.path.abspath(p or os.curdir) != here]
+    spec = importlib.machinery.PathFinder.find_spec("sitecustomize", path)
+    if spec is None or spec.loader is None:
+        return
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+
+try:
+    _chain_sitecustomize()
+except Exception as e:
+    sys.stderr.write("Error in sitecustomize: %r\n" % (e,))
+
+_preloaded.update(sys.modules)
+_trace_dir = os.environ.get("PYCOMPILER_TRACE_DIR")
+_opened = {}
+_importers = {}
+
+
+def _record(name, importer):
+    if name and importer:
+        _importers.setdefault(name, set()).add(importer)
+
+
+_stdlib_dir = os.path.dirname(os.path.abspath(os.__file__))
+
+
+def _record_open(path):
+    # 记录读取文件的模块：调用栈上最内层的非标准库代码
+    # （跳过 open、importlib.resources、pkgutil 等标准库封装）
+    readers = _opened.setdefault(os.path.abspath(path), set())
+    frame = sys._getframe(0)
+    while frame is not None:
+        filename = frame.f_globals.get("__file__")
+        if filename and frame.f_globals.get("__name__") != __name__:
+            filename = os.path.abspath(filename)
+            if not filename.startswith(_stdlib_dir + os.sep) or \
+                    "site-packages" in filename:
+                readers.add(filename)
+                return
+        frame = frame.f_back
+
+
+def _audit(event, args):
+    # 审计钩子抛出异常会让被审计的操作失败，因此这里不能抛出任何异常
+    if event != "open" or not args:
+        return
+    try:
+        path = os.fspath(args[0])
+        if not isinstance(path, str):
+            return
+        mode = args[1] if len(args) > 1 else None
+        flags = args[2] if len(args) > 2 else 0
+        if isinstance(mode, str):
+            if "r" in mode and "+" not in mode:
+                _record_open(path)
+        elif isinstance(flags, int) and not flags & (os.O_WRONLY | os.O_RDWR):
+            _record_open(path)
+    except Exception:
+        pass
+
+
+_original_import = builtins.__import__
+_original_import_module = importlib.import_module
+
+
+def _traced_import(name, globals=None, locals=None, fromlist=(), level=0):
+    module = _original_import(name, globals, locals, fromlist, level)
+    try:
+        importer = globals.get("__file__") if globals else None
+        if importer:
+            fullname = name
+            if level:
+                fullname = importlib.util.resolve_name(
+                    "." * level + name, globals.get("__package__"))
+            _record(fullname, importer)
+            for item in fromlist or ():
+                if item != "*":
+                    _record(fullname + "." + item, importer)
+    except Exception:
+        pass
+    return module
+
+
+def _traced_import_module(name, package=None):
+    module = _original_import_module(name, package)
+    try:
+        fullname = name
+        if name.startswith("."):
+            fullname = importlib.util.resolve_name(name, package)
+        _record(fullname, sys._getframe(1).f_globals.get("__file__"))
+    except Exception:
+        pass
+    return module
+
+
+class _ImporterRecorder:
+    """记录其他导入方式（pkgutil、runpy 等）首次加载模块时的调用方"""
+
+    def find_spec(self, fullname, path, target=None):
+        frame = sys._getframe(1)
+        while frame is not None:
+            module_name = frame.f_globals.get("__name__") or ""
+            filename = frame.f_code.co_filename
+            if not (filename.startswith("<frozen") or module_name == __name__ or
+                    module_name == "importlib" or module_name.startswith("importlib.")):
+                _record(fullname, frame.f_globals.get("__file__"))
+                break
+            frame = frame.f_back
+        return None
+
+
+def _dump():
+    modules = {}
+    for name, module in list(sys.modules.items()):
+        if name not in _preloaded:
+            modules[name] = getattr(module, "__file__", None)
+    importers = {name: sorted(files) for name, files in list(_importers.items())}
+    files = {path: sorted(readers) for path, readers in list(_opened.items())}
+    data = {"modules": modules, "importers": importers, "files": files}
+    out = os.path.join(_trace_dir, "trace-%d.json" % os.getpid())
+    with open(out + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(out + ".tmp", out)
+
+
+def _snapshot_loop():
+    # 进程可能因超时被强制结束，因此定期保存快照
+    while True:
+        try:
+            _dump()
+        except Exception:
+            pass
+        threading.Event().wait(0.5)
+
+
+if _trace_dir:
+    if hasattr(sys, "addaudithook"):
+        sys.addaudithook(_audit)
+    builtins.__import__ = _traced_import
+    importlib.import_module = _traced_import_module
+    sys.meta_path.insert(0, _ImporterRecorder())
+    atexit.register(_dump)
+    threading.Thread(target=_snapshot_loop, daemon=True).start()
+'''
+
+
+# 延迟导入运行时钩子：被选中的模块在首次访问属性时才真正执行
+# （生成钩子文件时会在开头写入 _LAZY 和 _EAGER 两个集合）
+LAZY_IMPORT_HOOK = r'''
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import sys
+
+
+def _matches(name, names):
+    return any(name == n or name.startswith(n + ".") for n in names)
+
+
+class _LazyImportFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self, fullname, path, target=None):
+        if not _matches(fullname, _LAZY) or _matches(fullname, _EAGER):
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        # 扩展模块和没有 exec_module 的加载器无法延迟执行
+        loader = spec.loader
+        if loader is None or not hasattr(loader, "exec_module") or \
+                isinstance(loader, importlib.machinery.ExtensionFileLoader):
+            return spec
+        spec.loader = importlib.util.LazyLoader(loader)
+        return spec
+
+
+sys.meta_path.insert(0, _LazyImportFinder())
+'''
+
+
+# 对比检查用运行时钩子：设置了环境变量时改为行缓冲输出，并在退出时把导入统计写入该文件
+IMPORT_STATS_HOOK = r'''
+import atexit
+import os
+import sys
+
+
+def _write_import_stats():
+    path = os.environ.get("PYCOMPILER_IMPORT_STATS")
+    if not path:
+        return
+    import importlib.util
+    import json
+    lazy_type = getattr(importlib.util, "_LazyModule", None)
+    modules = list(sys.modules.values())
+    lazy = sum(1 for m in modules if lazy_type is not None and type(m) is lazy_type)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"imported": len(modules) - lazy, "lazy": lazy}, f)
+
+
+if os.environ.get("PYCOMPILER_IMPORT_STATS"):
+    # 标准输出是管道时默认块缓冲，改为行缓冲才能测出首行输出的真实时间
+    # （冻结程序的引导程序可能忽略 PYTHONUNBUFFERED）
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=True)
+    atexit.register(_write_import_stats)
+'''
 
 
 class PyInstallerGUI:
@@ -27,6 +281,33 @@ class PyInstallerGUI:
         'pyinstaller-hooks-contrib',
     ]
     
+    # 持久构建缓存总大小上限（字节），超出后按最近最少使用(LRU)淘汰
+    BUILD_CACHE_MAX_SIZE = 2 * 1024 * 1024 * 1024
+    
+    # 查找项目文件时排除的目录（虚拟环境、构建输出等）
+    EXCLUDED_DIRS = ['.git', '__pycache__', 'venv', 'env', '.venv', 'node_modules', 'dist', 'build']
+    
+    # 追踪运行超时时间（秒）：入口脚本 / 测试命令
+    TRACE_TIMEOUT = 60
+    TRACE_TEST_TIMEOUT = 600
+    
+    # 测试命令中加载但不应打包进程序的测试框架模块
+    TRACE_EXCLUDED_PACKAGES = {
+        'sitecustomize', 'pytest', '_pytest', 'pluggy', 'py', 'iniconfig',
+        'unittest', 'nose', 'nose2', 'doctest', 'coverage', 'xdist', 'execnet',
+    }
+    
+    # 导入时有副作用、必须立即导入的模块（始终不延迟）
+    LAZY_EAGER_MODULES = [
+        'encodings', 'site', 'sitecustomize', 'warnings', 'logging', 'atexit',
+        'signal', 'faulthandler', 'multiprocessing', 'ctypes', 'tkinter',
+        'readline', 'pkg_resources', 'setuptools', 'gevent', 'eventlet',
+    ]
+    
+    # 对比检查：每个版本运行次数和单次运行超时时间（秒）
+    LAZY_CHECK_RUNS = 3
+    LAZY_CHECK_TIMEOUT = 30
+    
     def __init__(self, root):
         self.root = root
         self._init_window()
@@ -40,7 +321,7 @@ class PyInstallerGUI:
     def _init_window(self):
         """初始化窗口"""
         self.root.title("PythonCompiler - EXE打包工具")
-        self.root.geometry("750x750")
+        self.root.geometry("750x980")
         self.root.resizable(True, True)
         
         # 设置窗口图标（支持打包后的exe环境）
@@ -80,6 +361,13 @@ class PyInstallerGUI:
         self.auto_install = tk.BooleanVar(value=True)
         self.pack_directory = tk.BooleanVar(value=False)  # 是否打包整个目录
         self.main_script = tk.StringVar()  # 目录模式下的主入口文件
+        self.build_cache = tk.BooleanVar(value=False)  # 复用持久构建缓存
+        self.trace_run = tk.BooleanVar(value=False)  # 打包前追踪运行
+        self.test_command = tk.StringVar()  # 追踪运行时额外执行的测试命令
+        self.lazy_imports = tk.BooleanVar(value=False)  # 延迟导入选定的模块
+        self.lazy_modules = tk.StringVar()  # 延迟导入的模块（逗号分隔）
+        self.eager_modules = tk.StringVar()  # 强制立即导入的模块（逗号分隔）
+        self.lazy_check = tk.BooleanVar(value=False)  # 对比检查模式
     
     def _init_ui(self):
         """初始化用户界面"""
@@ -195,6 +483,24 @@ class PyInstallerGUI:
                       variable=self.windowed).pack(anchor=tk.W, pady=3)
         tk.Checkbutton(options_frame, text="清理临时文件 (--clean)", 
                       variable=self.clean).pack(anchor=tk.W, pady=3)
+        
+        cache_frame = tk.Frame(options_frame)
+        cache_frame.pack(fill=tk.X, pady=3)
+        tk.Checkbutton(cache_frame, text="复用构建缓存 (保留 PyInstaller 分析结果，启用时忽略 --clean)", 
+                      variable=self.build_cache).pack(side=tk.LEFT)
+        tk.Button(cache_frame, text="清空缓存", command=self._clear_build_cache,
+                 width=10).pack(side=tk.RIGHT)
+        
+        tk.Checkbutton(options_frame, text="打包前追踪运行 (记录实际加载的模块和数据文件)", 
+                      variable=self.trace_run).pack(anchor=tk.W, pady=3)
+        self._create_file_input(options_frame, "测试命令:", self.test_command)
+        
+        tk.Checkbutton(options_frame, text="延迟导入 (首次访问属性时才加载选定的模块，缩短启动时间)", 
+                      variable=self.lazy_imports).pack(anchor=tk.W, pady=3)
+        self._create_file_input(options_frame, "延迟模块:", self.lazy_modules)
+        self._create_file_input(options_frame, "立即导入:", self.eager_modules)
+        tk.Checkbutton(options_frame, text="对比检查 (额外构建立即导入版本，比较启动耗时和导入数量)", 
+                      variable=self.lazy_check).pack(anchor=tk.W, pady=3)
     
     def _create_action_buttons(self):
         """创建操作按钮区域"""
@@ -508,6 +814,595 @@ class PyInstallerGUI:
                 "警告", f"以下库安装失败:\n{', '.join(failed_deps)}"))
         self._log("=" * 60)
     
+    # ========== 构建缓存方法 ==========
+    
+    def _get_build_cache_root(self):
+        """获取持久构建缓存根目录"""
+        return os.path.join(get_cache_dir(), "build")
+    
+    def _get_build_workpath(self, entry_script):
+        """获取项目的持久 --workpath（按解释器和入口文件区分），并记录使用时间"""
+        interpreter = hashlib.sha256(
+            f"{sys.executable}|{sys.version}".encode("utf-8")).hexdigest()[:16]
+        project = hashlib.sha256(
+            os.path.abspath(entry_script).encode("utf-8")).hexdigest()[:16]
+        workpath = os.path.join(self._get_build_cache_root(), interpreter, project)
+        os.makedirs(workpath, exist_ok=True)
+        with open(os.path.join(workpath, ".last_used"), 'w', encoding='utf-8') as f:
+            f.write(str(time.time()))
+        return workpath
+    
+    def _get_dir_size(self, directory):
+        """计算目录总大小（字节）"""
+        total = 0
+        for root, dirs, files in os.walk(directory):
+            for file in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, file))
+                except OSError:
+                    pass
+        return total
+    
+    def _evict_build_cache(self, keep=None):
+        """构建缓存超过大小上限时，按最近最少使用淘汰其他项目的缓存"""
+        entries = []
+        cache_root = self._get_build_cache_root()
+        if not os.path.isdir(cache_root):
+            return
+        for interpreter in os.listdir(cache_root):
+            interpreter_dir = os.path.join(cache_root, interpreter)
+            if not os.path.isdir(interpreter_dir):
+                continue
+            for project in os.listdir(interpreter_dir):
+                workpath = os.path.join(interpreter_dir, project)
+                try:
+                    last_used = os.path.getmtime(os.path.join(workpath, ".last_used"))
+                except OSError:
+                    last_used = 0
+                entries.append((last_used, workpath, self._get_dir_size(workpath)))
+        
+        total = sum(size for _, _, size in entries)
+        for _, workpath, size in sorted(entries):
+            if total <= self.BUILD_CACHE_MAX_SIZE:
+                break
+            if keep and os.path.abspath(workpath) == os.path.abspath(keep):
+                continue
+            shutil.rmtree(workpath, ignore_errors=True)
+            total -= size
+            self._log(f"构建缓存超过上限，已清理: {workpath}")
+    
+    def _clear_build_cache(self):
+        """清空持久构建缓存"""
+        try:
+            shutil.rmtree(self._get_build_cache_root(), ignore_errors=True)
+            self._log("构建缓存已清空")
+        except Exception as e:
+            self._log(f"清空缓存时发生错误: {str(e)}")
+    
+    # ========== 追踪运行方法 ==========
+    
+    def _load_distribution_versions(self):
+        """获取 顶层模块名 -> 包版本 的映射"""
+        versions = {}
+        try:
+            import importlib.metadata as metadata
+            for top, dists in metadata.packages_distributions().items():
+                try:
+                    versions[top] = "|".join(
+                        f"{dist}=={metadata.version(dist)}" for dist in dists)
+                except Exception:
+                    pass
+        except Exception:
+            # Python 3.10 以下没有 packages_distributions，仅依赖文件哈希
+            pass
+        return versions
+    
+    def _find_module_spec(self, module_name, search_paths, spec_cache):
+        """在不执行任何包代码的前提下查找模块"""
+        if module_name in spec_cache:
+            return spec_cache[module_name]
+        
+        spec = None
+        if module_name not in sys.builtin_module_names:
+            parent, _, _ = module_name.rpartition('.')
+            try:
+                if parent:
+                    parent_spec = self._find_module_spec(parent, search_paths, spec_cache)
+                    if parent_spec is not None and parent_spec.submodule_search_locations:
+                        spec = importlib.machinery.PathFinder.find_spec(
+                            module_name, list(parent_spec.submodule_search_locations))
+                else:
+                    spec = importlib.machinery.PathFinder.find_spec(
+                        module_name, search_paths)
+            except (ImportError, ValueError):
+                spec = None
+        
+        spec_cache[module_name] = spec
+        return spec
+    
+    def _find_search_root(self, path, search_roots):
+        """返回包含该文件的最长导入根目录，没有则返回None"""
+        for root in search_roots:
+            try:
+                if os.path.commonpath([path, root]) == root:
+                    return root
+            except ValueError:
+                continue
+        return None
+    
+    def _is_project_file(self, path, project_dir, package_dirs, search_roots=None):
+        """判断文件是否属于项目代码（项目内的虚拟环境和已安装包不算）
+        
+        单文件模式下脚本所在目录不是项目树，传入 search_roots 时只有
+        经由该目录导入（最长导入根目录就是它）的文件才算项目代码。
+        """
+        try:
+            if os.path.commonpath([path, project_dir]) != project_dir:
+                return False
+        except ValueError:
+            # 不同盘符的路径
+            return False
+        
+        for package_dir in package_dirs:
+            try:
+                if os.path.commonpath([path, package_dir]) == package_dir:
+                    return False
+            except ValueError:
+                pass
+        
+        parts = os.path.relpath(path, project_dir).split(os.sep)[:-1]
+        if any(p in self.EXCLUDED_DIRS or p in ('site-packages', 'dist-packages')
+               for p in parts):
+            return False
+        if search_roots is not None:
+            return self._find_search_root(path, search_roots) == project_dir
+        return True
+    
+    def _kill_process_tree(self, process):
+        """结束进程及其所有子进程"""
+        try:
+            if sys.platform == "win32":
+                subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except Exception:
+            process.kill()
+    
+    def _run_with_timeout(self, cmd, cwd=None, env=None, timeout=None, shell=False):
+        """运行命令并把输出写入日志，超时后强制结束
+        
+        返回退出码，超时被结束时返回None。
+        """
+        kwargs = {}
+        if sys.platform != "win32":
+            kwargs["start_new_session"] = True
+        
+        process = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            env=env,
+            shell=shell,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            encoding='utf-8',
+            errors='replace',
+            **kwargs
+        )
+        
+        timed_out = threading.Event()
+        
+        def on_timeout():
+            timed_out.set()
+            self._kill_process_tree(process)
+        
+        timer = None
+        if timeout is not None:
+            timer = threading.Timer(timeout, on_timeout)
+            timer.start()
+        try:
+            for line in process.stdout:
+                self._log(line.rstrip())
+            process.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+        
+        if timed_out.is_set():
+            self._log(f"运行超过 {timeout} 秒，已结束进程")
+            return None
+        return process.returncode
+    
+    def _trace_cache_key(self, entry_script, project_dir, single_file):
+        """根据追踪钩子版本、解释器、已安装包版本、入口和测试命令生成追踪缓存键
+        
+        目录模式下还包含项目源码内容；单文件模式只在读取缓存时校验
+        入口脚本和它实际导入的项目文件（见 _load_trace_cache）。
+        """
+        digest = hashlib.sha256()
+        digest.update(hashlib.sha256(TRACE_SITECUSTOMIZE.encode("utf-8")).digest())
+        digest.update(f"{sys.executable}|{sys.version}".encode("utf-8"))
+        # 安装或升级插件包会改变入口点发现的结果
+        for top, version in sorted(self._load_distribution_versions().items()):
+            digest.update(f"{top}|{version}".encode("utf-8"))
+        digest.update(os.path.abspath(entry_script).encode("utf-8"))
+        digest.update(self.test_command.get().strip().encode("utf-8"))
+        if not single_file:
+            for py_file in sorted(self._find_python_files(project_dir)):
+                digest.update(os.path.relpath(py_file, project_dir).encode("utf-8"))
+                digest.update(self._hash_file(py_file).encode("utf-8"))
+        return digest.hexdigest()
+    
+    def _hash_file(self, path):
+        """计算文件内容的哈希，文件不存在时返回空字符串"""
+        try:
+            with open(path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return ""
+    
+    def _load_trace_cache(self, cache_file):
+        """读取追踪缓存，记录的源码文件有变化时视为未命中"""
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        for path, file_hash in cached.get("sources", {}).items():
+            if self._hash_file(path) != file_hash:
+                return None
+        return cached.get("result")
+    
+    def _is_test_module(self, name, path, project_dir):
+        """判断模块是否属于测试框架或项目测试代码"""
+        top = name.partition('.')[0]
+        if top in self.TRACE_EXCLUDED_PACKAGES or top == 'conftest':
+            return True
+        if top.startswith(('test_', 'pytest_')) or top in ('test', 'tests'):
+            return True
+        if path:
+            rel = os.path.relpath(os.path.abspath(path), project_dir)
+            parts = rel.split(os.sep)
+            if parts[0] != '..' and any(p in ('test', 'tests') for p in parts[:-1]):
+                return True
+        return False
+    
+    def _select_app_modules(self, trace, seed_files):
+        """从测试命令的追踪结果中选出应用代码（直接或间接）导入的模块
+        
+        seed_files 为已确认属于应用的源码文件：入口脚本以及入口脚本运行时
+        加载的模块。只被测试代码导入的模块（及其导入的模块）不会被选中。
+        """
+        modules = trace.get("modules", {})
+        importers = trace.get("importers", {})
+        
+        kept = set()
+        kept_files = set(seed_files)
+        changed = True
+        while changed:
+            changed = False
+            for name, files in importers.items():
+                if name in kept or name not in modules:
+                    continue
+                if any(os.path.abspath(f) in kept_files for f in files):
+                    kept.add(name)
+                    if modules[name]:
+                        kept_files.add(os.path.abspath(modules[name]))
+                    changed = True
+        
+        # 导入子模块时其父包也会被导入
+        for name in list(kept):
+            parts = name.split('.')
+            kept.update('.'.join(parts[:i]) for i in range(1, len(parts))
+                        if '.'.join(parts[:i]) in modules)
+        return kept, kept_files
+    
+    def _merge_traces(self, trace_dirs, entry_script, project_dir, single_file):
+        """合并各进程的追踪结果，返回隐藏导入、数据文件、需要复制的元数据
+        以及实际用到的项目源码文件
+        
+        trace_dirs 为 (追踪目录, 是否来自测试命令) 的列表，入口脚本的追踪目录需排在前面。
+        """
+        hidden_imports = set()
+        script_files = {entry_script}
+        datas = set()
+        metadata = set()
+        sources = set()
+        search_paths = [project_dir] + [p for p in sys.path if p]
+        search_roots = sorted(
+            (os.path.abspath(p) for p in search_paths if os.path.isdir(p)),
+            key=len, reverse=True)
+        project_roots = search_roots if single_file else None
+        paths = sysconfig.get_paths()
+        package_dirs = {os.path.abspath(paths[k]) for k in ("purelib", "platlib")}
+        spec_cache = {}
+        skipped_exts = ('.py', '.pyc', '.pyo', '.pyd', '.so', '.dll', '.pth', '.exe')
+        
+        traces = []
+        for trace_dir, from_tests in trace_dirs:
+            for filename in sorted(os.listdir(trace_dir)):
+                if not (filename.startswith("trace-") and filename.endswith(".json")):
+                    continue
+                try:
+                    with open(os.path.join(trace_dir, filename), 'r', encoding='utf-8') as f:
+                        traces.append((json.load(f), from_tests))
+                except (OSError, ValueError):
+                    continue
+        
+        for trace, from_tests in traces:
+            modules = trace.get("modules", {})
+            app_modules = None
+            app_files = set()
+            if from_tests:
+                app_modules, app_files = self._select_app_modules(trace, script_files)
+            
+            for name, path in modules.items():
+                if name == "__main__" or not all(p.isidentifier() for p in name.split('.')):
+                    continue
+                if name.partition('.')[0] in self.TRACE_EXCLUDED_PACKAGES:
+                    continue
+                if from_tests and (name not in app_modules or
+                                   self._is_test_module(name, path, project_dir)):
+                    continue
+                # 内置模块、运行时生成的模块等无法作为隐藏导入
+                if not (path and os.path.isfile(path)) and \
+                        self._find_module_spec(name, search_paths, spec_cache) is None:
+                    continue
+                hidden_imports.add(name)
+                if path:
+                    app_files.add(os.path.abspath(path))
+                    if not from_tests:
+                        script_files.add(os.path.abspath(path))
+                    if self._is_project_file(os.path.abspath(path), project_dir,
+                                             package_dirs, project_roots):
+                        sources.add(os.path.abspath(path))
+            
+            # 单文件模式下只接受脚本旁边或项目包目录中的数据文件
+            project_data_dirs = {project_dir} | {
+                os.path.join(project_dir, os.path.relpath(f, project_dir).split(os.sep)[0])
+                for f in sources if os.path.dirname(f) != project_dir}
+            
+            for path, readers in trace.get("files", {}).items():
+                if not os.path.isfile(path) or path.lower().endswith(skipped_exts):
+                    continue
+                # 跳过缓存目录和隐藏目录（如 .pytest_cache、.git）
+                if any(p == '__pycache__' or p.startswith('.') and p not in ('.', '..')
+                       for p in path.split(os.sep)[:-1]):
+                    continue
+                # 测试命令中只保留由项目非测试代码或其导入的模块读取的文件
+                if from_tests and not any(os.path.abspath(r) in app_files for r in readers):
+                    continue
+                
+                # 入口点等插件机制依赖包的 dist-info 元数据
+                # （测试框架启动时会扫描所有已安装包的元数据，因此只采用入口脚本的记录）
+                parent = os.path.basename(os.path.dirname(path))
+                if parent.endswith(('.dist-info', '.egg-info')):
+                    if not from_tests:
+                        metadata.add(parent.rsplit('.', 1)[0].split('-')[0])
+                    continue
+                
+                root = self._find_search_root(path, search_roots)
+                if root is None:
+                    continue
+                if single_file and root == project_dir and not (
+                        os.path.dirname(path) == project_dir or
+                        any(os.path.commonpath([path, d]) == d
+                            for d in project_data_dirs if d != project_dir)):
+                    continue
+                dest = os.path.dirname(os.path.relpath(path, root)) or "."
+                datas.add((path, dest))
+        
+        return {
+            "hidden_imports": sorted(hidden_imports),
+            "datas": sorted(list(d) for d in datas),
+            "metadata": sorted(metadata),
+            "sources": sorted(sources),
+        }
+    
+    def _trace_run(self, entry_script, project_dir, single_file):
+        """运行入口脚本（及可选的测试命令）并记录实际加载的模块和数据文件
+        
+        只有所有运行都正常结束时才缓存结果，项目源码、已安装包、入口或
+        测试命令不变时直接复用。
+        """
+        project_dir = os.path.abspath(project_dir)
+        entry_script = os.path.abspath(entry_script)
+        cache_dir = os.path.join(get_cache_dir(), "traces")
+        cache_file = os.path.join(
+            cache_dir, self._trace_cache_key(entry_script, project_dir, single_file) + ".json")
+        
+        if os.path.exists(cache_file):
+            result = self._load_trace_cache(cache_file)
+            if result is not None:
+                self._log("使用缓存的追踪结果（项目源码未变化）")
+                return result
+        
+        with tempfile.TemporaryDirectory(prefix="pycompiler-trace-") as work_dir:
+            hook_dir = os.path.join(work_dir, "hook")
+            # 入口脚本和测试命令分别输出到各自目录，避免进程号复用时互相覆盖
+            script_trace_dir = os.path.join(work_dir, "script")
+            test_trace_dir = os.path.join(work_dir, "test")
+            for directory in (hook_dir, script_trace_dir, test_trace_dir):
+                os.makedirs(directory)
+            with open(os.path.join(hook_dir, "sitecustomize.py"), 'w', encoding='utf-8') as f:
+                f.write(TRACE_SITECUSTOMIZE)
+            
+            env = os.environ.copy()
+            env["PYTHONPATH"] = os.pathsep.join(
+                p for p in [hook_dir, project_dir, env.get("PYTHONPATH")] if p)
+            # 让测试命令中的 python / pytest 优先使用打包所用的解释器
+            python_dir = os.path.dirname(sys.executable)
+            python_dirs = [python_dir, os.path.join(python_dir, "Scripts")]
+            env["PATH"] = os.pathsep.join(
+                [p for p in python_dirs if os.path.isdir(p)] + [env.get("PATH", "")])
+            
+            self._log(f"追踪运行: {entry_script}")
+            env["PYCOMPILER_TRACE_DIR"] = script_trace_dir
+            returncodes = [self._run_with_timeout(
+                [sys.executable, entry_script], project_dir, env, self.TRACE_TIMEOUT)]
+            
+            test_command = self.test_command.get().strip()
+            if test_command:
+                self._log(f"追踪运行测试命令: {test_command}")
+                env["PYCOMPILER_TRACE_DIR"] = test_trace_dir
+                returncodes.append(self._run_with_timeout(
+                    test_command, project_dir, env, self.TRACE_TEST_TIMEOUT, shell=True))
+            
+            result = self._merge_traces(
+                [(script_trace_dir, False), (test_trace_dir, True)],
+                entry_script, project_dir, single_file)
+        
+        if any(code != 0 for code in returncodes):
+            self._log("警告: 追踪运行未正常结束（出错或超时），结果仅用于本次打包，不写入缓存")
+            return result
+        
+        sources = {path: self._hash_file(path) for path in result["sources"] + [entry_script]}
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({"result": result, "sources": sources}, f)
+        return result
+    
+    # ========== 延迟导入方法 ==========
+    
+    def _parse_module_list(self, text):
+        """解析逗号分隔的模块名列表"""
+        return sorted({m.strip() for m in text.split(',') if m.strip()})
+    
+    def _write_runtime_hook(self, filename_prefix, content):
+        """把运行时钩子写入缓存目录，内容不变时文件路径也不变"""
+        hook_dir = os.path.join(get_cache_dir(), "runtime_hooks")
+        os.makedirs(hook_dir, exist_ok=True)
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+        path = os.path.join(hook_dir, f"{filename_prefix}_{digest}.py")
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        return path
+    
+    def _create_lazy_import_hook(self):
+        """生成延迟导入运行时钩子，没有可延迟的模块时返回None"""
+        eager = set(self.LAZY_EAGER_MODULES) | set(self._parse_module_list(self.eager_modules.get()))
+        lazy = [m for m in self._parse_module_list(self.lazy_modules.get())
+                if not any(m == e or m.startswith(e + ".") for e in eager)]
+        if not lazy:
+            return None
+        
+        self._log(f"延迟导入: {', '.join(lazy)}")
+        header = f"_LAZY = set({lazy!r})\n_EAGER = set({sorted(eager)!r})\n"
+        return self._write_runtime_hook("pyi_rth_lazy_import", header + LAZY_IMPORT_HOOK)
+    
+    def _find_built_exe(self, dist_dir, name):
+        """查找构建出的可执行文件（兼容单文件和目录模式）"""
+        exe_name = name + (".exe" if sys.platform == "win32" else "")
+        for path in (os.path.join(dist_dir, exe_name),
+                     os.path.join(dist_dir, name, exe_name)):
+            if os.path.isfile(path):
+                return path
+        return None
+    
+    def _measure_startup(self, exe_path):
+        """运行一次程序，返回 (首行输出耗时, 导入统计)"""
+        with tempfile.TemporaryDirectory(prefix="pycompiler-check-") as tmp_dir:
+            stats_file = os.path.join(tmp_dir, "stats.json")
+            env = os.environ.copy()
+            env["PYCOMPILER_IMPORT_STATS"] = stats_file
+            kwargs = {}
+            if sys.platform != "win32":
+                kwargs["start_new_session"] = True
+            
+            start = time.perf_counter()
+            process = subprocess.Popen(
+                [exe_path],
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+                encoding='utf-8',
+                errors='replace',
+                **kwargs
+            )
+            timer = threading.Timer(self.LAZY_CHECK_TIMEOUT,
+                                    self._kill_process_tree, args=(process,))
+            timer.start()
+            try:
+                first_line = process.stdout.readline()
+                first_line_time = time.perf_counter() - start if first_line else None
+                for _ in process.stdout:
+                    pass
+                process.wait()
+            finally:
+                timer.cancel()
+            
+            stats = None
+            try:
+                with open(stats_file, 'r', encoding='utf-8') as f:
+                    stats = json.load(f)
+            except (OSError, ValueError):
+                pass
+            return first_line_time, stats
+    
+    def _compare_startup(self, eager_exe, lazy_exe):
+        """多次运行两个版本，比较首行输出耗时和导入数量（取中位数）"""
+        results = {}
+        for label, exe_path in (("立即导入", eager_exe), ("延迟导入", lazy_exe)):
+            times = []
+            imported = []
+            lazy = []
+            for _ in range(self.LAZY_CHECK_RUNS):
+                first_line_time, stats = self._measure_startup(exe_path)
+                if first_line_time is not None:
+                    times.append(first_line_time)
+                if stats:
+                    imported.append(stats["imported"])
+                    lazy.append(stats["lazy"])
+            results[label] = (
+                f"{statistics.median(times):.3f}s" if times else "无输出",
+                str(int(statistics.median(imported))) if imported else "-",
+                str(int(statistics.median(lazy))) if lazy else "-",
+            )
+        
+        self._log(f"对比结果（运行 {self.LAZY_CHECK_RUNS} 次取中位数）:")
+        for label, (first_line, imported, lazy) in results.items():
+            self._log(f"{label}: 首行输出耗时 {first_line}, 已导入模块 {imported}, 延迟模块 {lazy}")
+    
+    def _run_lazy_check(self, base_cmd, entry_script, output_path, lazy_hook):
+        """在 lazy_check 目录下分别构建立即导入和延迟导入两个版本并对比启动性能
+        
+        两个版本都注入导入统计钩子，正式输出的程序不受影响。
+        """
+        name = self.name.get() or os.path.splitext(os.path.basename(entry_script))[0]
+        check_dir = os.path.abspath(os.path.join(output_path, "lazy_check"))
+        stats_hook = self._write_runtime_hook("pyi_rth_import_stats", IMPORT_STATS_HOOK)
+        
+        exes = {}
+        for variant, label, hooks in (("eager", "立即导入", [stats_hook]),
+                                      ("lazy", "延迟导入", [lazy_hook, stats_hook])):
+            self._log("=" * 60)
+            self._log(f"对比检查: 正在构建{label}版本...")
+            self._log("=" * 60)
+            variant_dir = os.path.join(check_dir, variant)
+            cmd = base_cmd + [
+                "--distpath", variant_dir,
+                "--workpath", os.path.join(variant_dir, "build"),
+                "--specpath", variant_dir,
+            ]
+            for hook in hooks:
+                cmd.extend(["--runtime-hook", hook])
+            cmd.append(entry_script)
+            
+            returncode = self._run_with_timeout(cmd)
+            exes[variant] = self._find_built_exe(variant_dir, name)
+            if returncode != 0 or not exes[variant]:
+                self._log("对比检查失败: 未找到构建出的可执行文件")
+                return
+        
+        self._log("=" * 60)
+        self._compare_startup(exes["eager"], exes["lazy"])
+        self._log("=" * 60)
+    
     # ========== 打包方法 ==========
     
     def _start_build(self):
@@ -520,7 +1415,7 @@ class PyInstallerGUI:
         python_files = []
         for root, dirs, files in os.walk(directory):
             # 排除常见的非打包目录
-            dirs[:] = [d for d in dirs if d not in ['.git', '__pycache__', 'venv', 'env', '.venv', 'node_modules', 'dist', 'build']]
+            dirs[:] = [d for d in dirs if d not in self.EXCLUDED_DIRS]
             for file in files:
                 if file.endswith('.py'):
                     python_files.append(os.path.join(root, file))
@@ -603,14 +1498,37 @@ class PyInstallerGUI:
                     
                     self._log("=" * 60)
             
+            hidden_imports = set()
+            project_dir = script if self.pack_directory.get() else os.path.dirname(script)
+            
+            # 追踪运行，捕获动态导入和运行时读取的数据文件
+            trace = None
+            if self.trace_run.get():
+                self._log("=" * 60)
+                self._log("正在追踪运行...")
+                try:
+                    trace = self._trace_run(entry_script, project_dir,
+                                            not self.pack_directory.get())
+                    hidden_imports.update(trace["hidden_imports"])
+                    self._log(f"追踪结果: {len(trace['hidden_imports'])} 个模块, "
+                              f"{len(trace['datas'])} 个数据文件")
+                except Exception as e:
+                    self._log(f"追踪运行失败: {str(e)}，将继续打包...")
+                self._log("=" * 60)
+            
+            # 命令中的路径统一转换为绝对路径：PyInstaller 按 --specpath 解析相对路径，
+            # 对比检查构建会改变 --specpath
+            script = os.path.abspath(script)
+            entry_script = os.path.abspath(entry_script)
+            
             # 构建pyinstaller命令
             cmd = ["pyinstaller"]
             
             if self.output_dir.get():
-                cmd.extend(["--distpath", self.output_dir.get()])
+                cmd.extend(["--distpath", os.path.abspath(self.output_dir.get())])
             
             if self.icon_path.get() and os.path.exists(self.icon_path.get()):
-                cmd.extend(["--icon", self.icon_path.get()])
+                cmd.extend(["--icon", os.path.abspath(self.icon_path.get())])
             
             if self.name.get():
                 cmd.extend(["--name", self.name.get()])
@@ -621,9 +1539,19 @@ class PyInstallerGUI:
             if self.windowed.get():
                 cmd.append("--windowed")
             
-            if self.clean.get():
+            # 持久构建缓存：复用上次的分析结果（PyInstaller 仅重新分析有变化的模块），
+            # --clean 会清除这些结果以及 PyInstaller 的二进制依赖缓存，因此不能同时使用
+            build_workpath = None
+            if self.build_cache.get():
+                build_workpath = self._get_build_workpath(entry_script)
+                cmd.extend(["--workpath", build_workpath])
+                if self.clean.get():
+                    self._log("已启用构建缓存，忽略 --clean")
+            elif self.clean.get():
                 cmd.append("--clean")
             
+            separator = ";" if sys.platform == "win32" else ":"
+            
             # 如果是目录模式，添加项目路径和所有文件
             if self.pack_directory.get():
                 # 添加项目目录到Python路径，让PyInstaller自动发现模块
@@ -631,12 +1559,10 @@ class PyInstallerGUI:
                 
                 # 添加项目目录中的所有非Python文件（数据文件）
                 # 使用--add-data将整个目录包含进去
-                separator = ";" if sys.platform == "win32" else ":"
                 cmd.extend(["--add-data", f"{script}{separator}."])
                 
                 # 添加所有Python模块作为隐藏导入（确保都被包含）
                 python_files = self._find_python_files(script)
-                imported_modules = set()
                 for py_file in python_files:
                     rel_path = os.path.relpath(py_file, script)
                     # 转换为模块名
@@ -649,9 +1575,39 @@ class PyInstallerGUI:
                                 module_parts.append(part)
                         if module_parts:
                             module_name = '.'.join(module_parts)
-                            if module_name not in imported_modules:
-                                imported_modules.add(module_name)
-                                cmd.extend(["--hidden-import", module_name])
+                            hidden_imports.add(module_name)
+            
+            for module_name in sorted(hidden_imports):
+                cmd.extend(["--hidden-import", module_name])
+            
+            # 添加追踪运行时读取的数据文件（目录模式下项目文件已整体包含）
+            if trace:
+                abs_script = os.path.abspath(script)
+                for src, dest in trace["datas"]:
+                    if not os.path.exists(src):
+                        continue
+                    if self.pack_directory.get() and \
+                            os.path.abspath(src).startswith(abs_script + os.sep):
+                        continue
+                    cmd.extend(["--add-data", f"{src}{separator}{dest}"])
+                for dist_name in trace["metadata"]:
+                    cmd.extend(["--copy-metadata", dist_name])
+            
+            # 延迟导入运行时钩子
+            base_cmd = list(cmd)
+            lazy_hook = None
+            run_check = False
+            if self.lazy_imports.get():
+                lazy_hook = self._create_lazy_import_hook()
+                if lazy_hook:
+                    cmd.extend(["--runtime-hook", lazy_hook])
+                    if self.lazy_check.get():
+                        if self.windowed.get():
+                            self._log("窗口模式下程序没有控制台输出，跳过对比检查")
+                        else:
+                            run_check = True
+                else:
+                    self._log("未指定可延迟导入的模块，跳过延迟导入")
             
             cmd.append(entry_script)
             
@@ -680,6 +1636,10 @@ class PyInstallerGUI:
                 self._log("打包成功！")
                 output_path = self.output_dir.get() or "dist"
                 self._log(f"输出目录: {os.path.abspath(output_path)}")
+                if run_check:
+                    self._run_lazy_check(base_cmd, entry_script, output_path, lazy_hook)
+                if build_workpath:
+                    self._evict_build_cache(keep=build_workpath)
                 self.root.after(0, lambda: messagebox.showinfo(
                     "成功", f"打包完成！\n输出目录: {os.path.abspath(output_path)}"))
             else: